@@ -0,0 +1,218 @@
+# numberdle_core.py
+# Shared Numberdle game logic (no Streamlit); imported by the app scripts
+# so optimizations and caches apply to every entry point in one process.
+
+import functools
+import json
+import os
+import random
+import re
+from typing import List, Optional, Tuple
+
+# ============================ Utilities ============================
+
+_rng = random.Random()  # module-private generator, seeded from os.urandom
+
+def new_secret() -> str:
+    # 17 bits cover 0..131071; redraw the top 31072 rather than take % 100000,
+    # which would make 00000-31071 twice as likely
+    n = _rng.getrandbits(17)
+    while n >= 100000:
+        n = _rng.getrandbits(17)
+    return f"{n:05d}"
+
+def evaluate_guess(secret: str, guess: str) -> List[str]:
+    """Return ['green'|'yellow'|'gray'] x 5 with duplicate handling."""
+    # Fixed width: both passes are written out per position
+    s0, s1, s2, s3, s4 = secret
+    g0, g1, g2, g3, g4 = guess
+    status = ["gray"] * 5
+    remain = {}
+    if g0 == s0:
+        status[0] = "green"
+    else:
+        remain[s0] = remain.get(s0, 0) + 1
+    if g1 == s1:
+        status[1] = "green"
+    else:
+        remain[s1] = remain.get(s1, 0) + 1
+    if g2 == s2:
+        status[2] = "green"
+    else:
+        remain[s2] = remain.get(s2, 0) + 1
+    if g3 == s3:
+        status[3] = "green"
+    else:
+        remain[s3] = remain.get(s3, 0) + 1
+    if g4 == s4:
+        status[4] = "green"
+    else:
+        remain[s4] = remain.get(s4, 0) + 1
+    if not remain:
+        return status
+    if g0 != s0 and remain.get(g0, 0) > 0:
+        status[0] = "yellow"
+        remain[g0] -= 1
+    if g1 != s1 and remain.get(g1, 0) > 0:
+        status[1] = "yellow"
+        remain[g1] -= 1
+    if g2 != s2 and remain.get(g2, 0) > 0:
+        status[2] = "yellow"
+        remain[g2] -= 1
+    if g3 != s3 and remain.get(g3, 0) > 0:
+        status[3] = "yellow"
+        remain[g3] -= 1
+    if g4 != s4 and remain.get(g4, 0) > 0:
+        status[4] = "yellow"
+    return status
+
+# Compact status codes for byte-packed boards ('' = not yet scored)
+STATUS_CODE = {"": 0, "green": 1, "yellow": 2, "gray": 3}
+
+def clamp_range_around_guess(guess: str, secret_int: int) -> Tuple[int, int]:
+    g = int(guess)
+    lo, hi = min(g, secret_int), max(g, secret_int)
+    pad = max(50, (hi - lo) // 5)
+    return max(0, lo - pad), min(99999, hi + pad)
+
+_MASK64 = (1 << 64) - 1
+
+def _mix(a: int, b: int) -> int:
+    """SplitMix64-style scramble of (a, b) into 64 well-distributed bits."""
+    x = (a * 0x9E3779B97F4A7C15 + b) & _MASK64
+    x ^= x >> 30
+    x = (x * 0xBF58476D1CE4E5B9) & _MASK64
+    x ^= x >> 27
+    x = (x * 0x94D049BB133111EB) & _MASK64
+    x ^= x >> 31
+    return x
+
+# Clue templates, bound once at import
+_RANGE_TMPL = "The number is between {:05d} and {:05d}.".format
+_DIGIT_REL_TMPL = "Digit {} {} digit {}.".format
+
+# All 2-of-5 clue index pairs, in sorted order
+_PICK_PAIRS = ((0,1),(0,2),(0,3),(0,4),(1,2),(1,3),(1,4),(2,3),(2,4),(3,4))
+# Adjacent digit positions compared by the digit-relation clue
+_ADJACENT_PAIRS = ((0,1),(1,2),(2,3),(3,4))
+
+@functools.lru_cache(maxsize=4096)
+def _gen_clues_impl(guess: str, round_idx: int, s_val: int, s_digits: Tuple[int, ...]) -> Tuple[str, ...]:
+    h = _mix(s_val, round_idx)
+    clues = []
+    lo, hi = clamp_range_around_guess(guess, s_val)
+    clues.append(_RANGE_TMPL(lo, hi))
+    clues.append("It is an odd number." if s_val & 1 else "It is an even number.")
+    # 10 = 1 (mod 3), so the digit sum and the number agree mod 3
+    clues.append(f"Sum of digits ≡ {s_val % 3} (mod 3).")
+    i, j = _ADJACENT_PAIRS[h & 3]
+    rel = "<" if s_digits[i] < s_digits[j] else (">" if s_digits[i] > s_digits[j] else "=")
+    clues.append(_DIGIT_REL_TMPL(i + 1, rel, j + 1))
+    clues.append("At least one digit repeats." if len(set(s_digits)) < 5 else "All digits are distinct.")
+    # 2 of the 5 clues: one of the 10 index pairs
+    pick = _PICK_PAIRS[(h >> 2) % 10]
+    return tuple(clues[k] for k in pick)
+
+def gen_clues(secret: str, guess: str, round_idx: int,
+              s_val: Optional[int] = None, s_digits: Optional[Tuple[int, ...]] = None) -> List[str]:
+    """Deterministic per (secret, guess, round); cached across reruns.
+
+    Callers that keep the secret's int value / digit tuple around (set once
+    per game) can pass them to skip re-parsing the string.
+    """
+    if s_val is None:
+        s_val = int(secret)
+    if s_digits is None:
+        s_digits = tuple(map(int, secret))
+    return list(_gen_clues_impl(guess, round_idx, s_val, s_digits))
+
+_NON_DIGITS = re.compile(r"[^0-9]+")
+# Deletes every ASCII character except 0-9
+_ASCII_NON_DIGITS = str.maketrans("", "", "".join(chr(c) for c in range(128) if not 48 <= c <= 57))
+
+def clean_digits(s: str) -> str:
+    # ASCII input (the usual case) stays in C via isdigit/translate; the
+    # regex only handles non-ASCII text, where str.isdigit is too permissive
+    if not s.isascii():
+        return _NON_DIGITS.sub("", s)[:5]
+    if s.isdigit():
+        return s[:5]
+    return s.translate(_ASCII_NON_DIGITS)[:5]
+
+# ============================ Page Styles ============================
+
+# Injected into the page <head> once per session by a zero-height component,
+# so the sheet skips the markdown pipeline. An st.markdown <style> would have
+# to be re-sent every run (Streamlit drops elements a run doesn't re-emit); a
+# node appended to <head> sits outside the element tree and persists.
+def head_style_injector(css: str) -> str:
+    """Script HTML that appends css to the parent page's <head>, once per page."""
+    return (
+        "<script>(function() {"
+        " const doc = window.parent.document;"
+        " if (doc.getElementById('nd-css')) return;"
+        " const el = doc.createElement('style');"
+        " el.id = 'nd-css';"
+        f" el.textContent = {json.dumps(css)};"
+        " doc.head.appendChild(el);"
+        "})();</script>"
+    )
+
+# ============================ Solve Stats ============================
+
+# One byte per solve (tries), shared by every app script; append-only, and
+# only the tail is ever read.
+STATS_PATH = "numberdle_stats.bin"
+LEGACY_STATS_PATH = "numberdle_stats.json"
+STATS_CAP = 1000  # solves kept once the file is compacted
+
+def _tries_byte(x) -> int:
+    return min(max(int(x), 0), 255)
+
+def _write_stats_file(raw: bytes):
+    # Write-then-rename so a concurrent reader never sees a partial file
+    tmp = STATS_PATH + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(raw)
+    os.replace(tmp, STATS_PATH)
+
+def migrate_legacy_stats():
+    """Seed the binary log from the old JSON list, once."""
+    if os.path.exists(STATS_PATH) or not os.path.exists(LEGACY_STATS_PATH):
+        return
+    try:
+        with open(LEGACY_STATS_PATH, "r") as f:
+            data = json.load(f)
+        out = []
+        if isinstance(data, list):
+            for x in data:
+                try:
+                    out.append(_tries_byte(x))
+                except Exception:
+                    pass
+        _write_stats_file(bytes(out[-STATS_CAP:]))
+    except Exception:
+        pass
+
+def append_stat(tries: int):
+    try:
+        with open(STATS_PATH, "ab") as f:
+            f.write(bytes([_tries_byte(tries)]))
+            size = f.tell()
+        # Ring-buffer bound: once the log doubles, keep only the newest STATS_CAP
+        if size > 2 * STATS_CAP:
+            with open(STATS_PATH, "rb") as f:
+                f.seek(-STATS_CAP, os.SEEK_END)
+                tail = f.read()
+            _write_stats_file(tail)
+    except Exception:
+        pass
+
+def stats_tail(n: int = 10) -> bytes:
+    try:
+        size = os.path.getsize(STATS_PATH)
+        with open(STATS_PATH, "rb") as f:
+            f.seek(max(0, size - n))
+            return f.read()
+    except OSError:
+        return b""
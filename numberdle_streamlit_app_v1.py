@@ -2,10 +2,8 @@
 # Streamlit "Numberdle" — guess a 5-digit number in 6 tries (00000–99999 allowed)
 # Run:  streamlit run numberdle_app.py
 
-import random
-import time
-from typing import List, Tuple
 import streamlit as st
+from numberdle_core import evaluate_guess, gen_clues, new_secret
 
 st.set_page_config(
     page_title="Numberdle",
@@ -13,85 +11,6 @@ st.set_page_config(
     layout="centered",
 )
 
-# ----------------------------- Utility Functions -----------------------------
-
-def new_secret() -> str:
-    """Return a 5-character string between '00000' and '99999'."""
-    return f"{random.randint(0, 99999):05d}"
-
-
-def evaluate_guess(secret: str, guess: str) -> List[str]:
-    """Wordle-style evaluation with duplicate handling.
-    Returns list of statuses for each position: 'green' | 'yellow' | 'gray'.
-    """
-    n = 5
-    status = ["gray"] * n
-    secret_counts = {}
-
-    # First pass: mark greens and count remaining secret digits
-    for i in range(n):
-        s, g = secret[i], guess[i]
-        if g == s:
-            status[i] = "green"
-        else:
-            secret_counts[s] = secret_counts.get(s, 0) + 1
-
-    # Second pass: mark yellows respecting counts
-    for i in range(n):
-        if status[i] == "green":
-            continue
-        g = guess[i]
-        if secret_counts.get(g, 0) > 0:
-            status[i] = "yellow"
-            secret_counts[g] -= 1
-    return status
-
-
-def clamp_range_around_guess(guess: str, secret: str) -> Tuple[int, int]:
-    """Produce a sensible numeric range hint around guess & secret."""
-    g = int(guess)
-    s = int(secret)
-    lo = min(g, s)
-    hi = max(g, s)
-    # widen a little so range feels helpful
-    pad = max(50, (hi - lo) // 5)
-    lo = max(0, lo - pad)
-    hi = min(99999, hi + pad)
-    return lo, hi
-
-
-def gen_clues(secret: str, guess: str, round_idx: int) -> List[str]:
-    """Generate 1–2 adaptive hints after a miss. Deterministic per round."""
-    rng = random.Random(hash((secret, round_idx)) & 0xFFFFFFFF)
-
-    s_digits = list(map(int, secret))
-    s_val = int(secret)
-
-    clues = []
-
-    # 1) Range hint
-    lo, hi = clamp_range_around_guess(guess, secret)
-    clues.append(f"The number is between {lo:05d} and {hi:05d}.")
-
-    # 2) Parity / divisibility
-    clues.append("It is an even number." if s_val % 2 == 0 else "It is an odd number.")
-    mod3 = sum(s_digits) % 3
-    clues.append(f"Sum of digits ≡ {mod3} (mod 3).")
-
-    # 3) Positional relations (pick safe ones)
-    pairs = [(0,1),(1,2),(2,3),(3,4)]
-    i, j = rng.choice(pairs)
-    relation = "<" if s_digits[i] < s_digits[j] else (">" if s_digits[i] > s_digits[j] else "=")
-    clues.append(f"Digit {i+1} {relation} digit {j+1}.")
-
-    # 4) Repetition fact
-    clues.append("At least one digit repeats." if len(set(secret)) < 5 else "All digits are distinct.")
-
-    # Pick 2 interesting & non-redundant clues deterministically
-    pick = rng.sample(range(len(clues)), k=2)
-    return [clues[k] for k in sorted(pick)]
-
-
 # ----------------------------- Session State -----------------------------
 
 if "secret" not in st.session_state:
@@ -5,9 +5,10 @@
 import random
 from typing import List, Tuple
 import streamlit as st
+from numberdle_core import append_stat, migrate_legacy_stats, stats_tail
 
 # Local stats + JS key handler
-import os, json, statistics
+import statistics
 import streamlit.components.v1 as components
 
 st.set_page_config(page_title="Numberdle", layout="centered")
@@ -64,36 +65,13 @@ def clean_digits(s: str) -> str:
 
 # ============================ Simple Stats ============================
 
-STATS_PATH = "numberdle_stats.json"
-
-def _load_stats():
-    try:
-        if os.path.exists(STATS_PATH):
-            with open(STATS_PATH, "r") as f:
-                data = json.load(f)
-            if isinstance(data, list):
-                out = []
-                for x in data:
-                    try:
-                        out.append(int(x))
-                    except Exception:
-                        pass
-                return out
-    except Exception:
-        pass
-    return []
-
-def _save_stats(data):
-    try:
-        with open(STATS_PATH, "w") as f:
-            json.dump([int(x) for x in data], f)
-    except Exception:
-        pass
-
+# Solves go to the byte log in numberdle_core, shared with the v5/v6 apps
 def _update_leaderboard_in_state():
-    data = _load_stats()
-    st.session_state.last_solved_tries = (data[-1] if data else None)
-    st.session_state.last10_avg = (round(statistics.mean(data[-10:]), 2) if data else None)
+    tail = stats_tail()
+    st.session_state.last_solved_tries = (tail[-1] if tail else None)
+    st.session_state.last10_avg = (round(statistics.mean(tail), 2) if tail else None)
+
+migrate_legacy_stats()
 
 # ============================ State ============================
 
@@ -143,10 +121,7 @@ def submit_guess():
         st.session_state.win = True
         st.session_state.error = ""
         # record win
-        tries = st.session_state.round + 1
-        data = _load_stats()
-        data.append(tries)
-        _save_stats(data)
+        append_stat(st.session_state.round + 1)
         _update_leaderboard_in_state()
     else:
         st.session_state.hints[st.session_state.round] = gen_clues(secret, guess, st.session_state.round)
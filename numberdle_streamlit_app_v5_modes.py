@@ -3,172 +3,107 @@
 # Run: streamlit run numberdle_app.py
 #multi modes : Normal, Hard, Ultra
 
-import random
-from typing import List, Tuple
 import streamlit as st
+from numberdle_core import (
+    append_stat, clean_digits, evaluate_guess, gen_clues, head_style_injector, migrate_legacy_stats,
+    new_secret, stats_tail,
+)
 
 # Local stats + JS key handler
-import os, json, statistics
 import streamlit.components.v1 as components
 from collections import Counter, defaultdict
 
 st.set_page_config(page_title="Numberdle", layout="centered")
 
-# ============================ Utilities ============================
-
-def new_secret() -> str:
-    return f"{random.randint(0, 99999):05d}"
-
-def evaluate_guess(secret: str, guess: str) -> List[str]:
-    """Return ['green'|'yellow'|'gray'] x 5 with duplicate handling."""
-    n = 5
-    status = ["gray"] * n
-    remain = {}
-    for i in range(n):
-        s, g = secret[i], guess[i]
-        if g == s:
-            status[i] = "green"
-        else:
-            remain[s] = remain.get(s, 0) + 1
-    for i in range(n):
-        if status[i] == "green":
-            continue
-        g = guess[i]
-        if remain.get(g, 0) > 0:
-            status[i] = "yellow"
-            remain[g] -= 1
-    return status
-
-def clamp_range_around_guess(guess: str, secret: str) -> Tuple[int, int]:
-    g, s = int(guess), int(secret)
-    lo, hi = min(g, s), max(g, s)
-    pad = max(50, (hi - lo) // 5)
-    return max(0, lo - pad), min(99999, hi + pad)
-
-def gen_clues(secret: str, guess: str, round_idx: int) -> List[str]:
-    rng = random.Random(hash((secret, round_idx)) & 0xFFFFFFFF)
-    s_digits = list(map(int, secret))
-    s_val = int(secret)
-    clues = []
-    lo, hi = clamp_range_around_guess(guess, secret)
-    clues.append(f"The number is between {lo:05d} and {hi:05d}.")
-    clues.append("It is an even number." if s_val % 2 == 0 else "It is an odd number.")
-    clues.append(f"Sum of digits {sum(s_digits) % 3} (mod 3).")
-    i, j = rng.choice([(0,1),(1,2),(2,3),(3,4)])
-    rel = "<" if s_digits[i] < s_digits[j] else (">" if s_digits[i] > s_digits[j] else "=")
-    clues.append(f"Digit {i+1} {rel} digit {j+1}.")
-    clues.append("At least one digit repeats." if len(set(secret)) < 5 else "All digits are distinct.")
-    pick = rng.sample(range(len(clues)), k=2)
-    return [clues[k] for k in sorted(pick)]
-
-def clean_digits(s: str) -> str:
-    return "".join(ch for ch in s if ch.isdigit())[:5]
-
 # ============================ Simple Stats ============================
 
-STATS_PATH = "numberdle_stats.json"
-
-def _load_stats():
-    try:
-        if os.path.exists(STATS_PATH):
-            with open(STATS_PATH, "r") as f:
-                data = json.load(f)
-            if isinstance(data, list):
-                out = []
-                for x in data:
-                    try:
-                        out.append(int(x))
-                    except Exception:
-                        pass
-                return out
-    except Exception:
-        pass
-    return []
-
-def _save_stats(data):
-    try:
-        with open(STATS_PATH, "w") as f:
-            json.dump([int(x) for x in data], f)
-    except Exception:
-        pass
-
 def _update_leaderboard_in_state():
-    data = _load_stats()
-    st.session_state.last_solved_tries = (data[-1] if data else None)
-    st.session_state.last10_avg = (round(statistics.mean(data[-10:]), 2) if data else None)
-# ====================== Hard/Ultra Mode Helpers ======================
+    tail = stats_tail()
+    st.session_state.last_solved_tries = (tail[-1] if tail else None)
+    st.session_state.last10_avg = (round(sum(tail) / len(tail), 2) if tail else None)
 
-def _build_knowledge(upto_round: int, mode: str):
-    """Aggregate constraints from previous feedback."""
-    greens = {}                      # position -> digit (str)
-    min_count = defaultdict(int)     # digit -> minimum occurrences
-    max_count = defaultdict(lambda: 5)  # digit -> maximum occurrences
-    banned_yellow = defaultdict(set) # digit -> positions not allowed (yellow spots)
-    banned_all = defaultdict(set)    # digit -> positions not allowed (yellow + gray-derived in Ultra)
-
-    for r in range(upto_round):
-        row = st.session_state.grid[r]
-        sts = st.session_state.status[r]
-        # Tolerate partially empty rows
-        if not row or not sts: 
-            continue
-        counts = Counter([d for d in row if d != ""])
-        matches = Counter()
+migrate_legacy_stats()
 
-        # Collect greens/yellows and per-round matches
-        for i in range(5):
-            d = row[i]
-            if d == "":
-                continue
-            s = sts[i]
-            if s == "green":
-                greens[i] = d
-                matches[d] += 1
-            elif s == "yellow":
-                banned_yellow[d].add(i)
-                banned_all[d].add(i)
-                matches[d] += 1
-            elif s == "gray":
-                # in Ultra we'll add gray positions to banned_all only when there are some matches for that digit in the same round
-                pass
-
-        # Update min counts from this round's matches
-        for d, k in matches.items():
-            if k > min_count[d]:
-                min_count[d] = k
-
-        # Update max counts & gray-position bans per round
-        for d, m in counts.items():
-            k = matches.get(d, 0)
-            if k == 0:
-                # digit was guessed this round but had 0 matches => secret contains 0 of this digit
-                # only applied as a hard cap in Ultra
-                max_count[d] = min(max_count[d], 0)
-            else:
-                # cap by observed matches for this round (Ultra)
-                if max_count[d] > k:
-                    max_count[d] = k
-                # Ultra: any gray instances of this digit in this round are position-banned
-                if mode == "Ultra":
-                    for i in range(5):
-                        if row[i] == d and sts[i] == "gray":
-                            banned_all[d].add(i)
-
-    return greens, min_count, max_count, banned_yellow, banned_all
+# ====================== Hard/Ultra Mode Helpers ======================
 
+def _new_knowledge():
+    return {
+        "greens": {},                         # position -> digit (str)
+        "min_count": defaultdict(int),        # digit -> minimum occurrences
+        "max_count": {},                      # digit -> maximum occurrences (absent = 5)
+        "banned_yellow": defaultdict(set),    # digit -> positions not allowed (yellow spots)
+        "banned_all": defaultdict(set),       # digit -> positions not allowed (yellow + gray-derived in Ultra)
+    }
+
+def _fold_round(knowledge, row, sts, mode: str):
+    """Fold one scored row into the aggregated constraints."""
+    greens = knowledge["greens"]
+    min_count = knowledge["min_count"]
+    max_count = knowledge["max_count"]
+    banned_yellow = knowledge["banned_yellow"]
+    banned_all = knowledge["banned_all"]
+
+    counts = Counter([d for d in row if d != ""])
+    matches = Counter()
+
+    # Collect greens/yellows and per-round matches
+    for i in range(5):
+        d = row[i]
+        if d == "":
+            continue
+        s = sts[i]
+        if s == "green":
+            greens[i] = d
+            matches[d] += 1
+        elif s == "yellow":
+            banned_yellow[d].add(i)
+            banned_all[d].add(i)
+            matches[d] += 1
+        elif s == "gray":
+            # in Ultra we'll add gray positions to banned_all only when there are some matches for that digit in the same round
+            pass
+
+    # Update min counts from this round's matches
+    for d, k in matches.items():
+        if k > min_count[d]:
+            min_count[d] = k
+
+    # Update max counts & gray-position bans per round
+    for d, m in counts.items():
+        k = matches.get(d, 0)
+        if k == 0:
+            # digit was guessed this round but had 0 matches => secret contains 0 of this digit
+            # only applied as a hard cap in Ultra
+            max_count[d] = 0
+        else:
+            # cap by observed matches for this round (Ultra)
+            if max_count.get(d, 5) > k:
+                max_count[d] = k
+            # Ultra: any gray instances of this digit in this round are position-banned
+            if mode == "Ultra":
+                for i in range(5):
+                    if row[i] == d and sts[i] == "gray":
+                        banned_all[d].add(i)
 
 def _validate_guess_against_history(guess: str, mode: str) -> (bool, str):
     """Return (ok, message). Enforces Normal/Hard/Ultra rules."""
     if mode not in ("Hard", "Ultra"):
         return True, ""
 
-    upto = st.session_state.round
-    greens, min_count, max_count, banned_yellow, banned_all = _build_knowledge(upto, mode)
-    # Greens must stay fixed
-    for i, d in greens.items():
+    knowledge = st.session_state.knowledge
+    # Greens must stay fixed (most common violation; <= 5 entries, so check first)
+    for i, d in knowledge["greens"].items():
         if guess[i] != d:
             return False, f"Position {i+1} must be {d} based on previous feedback."
 
+    min_count = knowledge["min_count"]
+    max_count = knowledge["max_count"]
+    banned_yellow = knowledge["banned_yellow"]
+    banned_all = knowledge["banned_all"]
+    if not (min_count or max_count):
+        # nothing but greens known yet (e.g. first round)
+        return True, ""
+
     # Count occurrences in this guess
     gcount = Counter(guess)
 
@@ -198,23 +133,45 @@ def _validate_guess_against_history(guess: str, mode: str) -> (bool, str):
     return True, ""
 
 
+# ============================ Board HTML ============================
+
+# status is always one of these four, so a direct lookup picks the template
+_TILE_TPL = {s: f"<div class='tile {s}'>{{}}</div>".format for s in ("green", "yellow", "gray", "neutral")}
+_EMPTY_ROW_HTML = _TILE_TPL["neutral"]("&nbsp;") * 5
+
+def _row_html(row, sts) -> str:
+    return "".join([_TILE_TPL[sts[c]](row[c] or "&nbsp;") for c in range(5)])
+
+_EMPTY_HINT_CARD = "<div class='hintcard'><div class='hinttitle'>&nbsp;</div><div class='hintline'>&nbsp;</div></div>"
+_EMPTY_HINTS_HTML = "<div class='hints-grid'>" + _EMPTY_HINT_CARD * 6 + "</div>"
+
+def _hint_card_html(r: int, hs) -> str:
+    if not hs:
+        return _EMPTY_HINT_CARD
+    lines_html = "".join(f"<div class='hintline'>{h}</div>" for h in hs)
+    return f"<div class='hintcard'><div class='hinttitle'>After guess #{r+1}</div>{lines_html}</div>"
+
 # ============================ State ============================
 
 def init_state():
     st.session_state.secret = new_secret()
+    st.session_state.secret_int = int(st.session_state.secret)
+    st.session_state.secret_digits = tuple(map(int, st.session_state.secret))
     st.session_state.round = 0
     st.session_state.grid = [["" for _ in range(5)] for _ in range(6)]
-    st.session_state.status = [["" for _ in range(5)] for _ in range(6)]
+    st.session_state.status = [["neutral"] * 5 for _ in range(6)]
     st.session_state.done = False
     st.session_state.win = False
     st.session_state.hints = [[] for _ in range(6)]
+    st.session_state.row_html = [_EMPTY_ROW_HTML] * 6  # scored rows never change
+    st.session_state.hint_html = [_EMPTY_HINT_CARD] * 6
+    st.session_state.knowledge = _new_knowledge()  # in-memory only
+    st.session_state._grid_v = 3  # fresh grid: 5 strings per row, "neutral" statuses, row_html
     st.session_state.rowbuf = ""
+    st.session_state.row_input = ""
     st.session_state.error = ""
     _update_leaderboard_in_state()
 
-if "secret" not in st.session_state:
-    init_state()
-
 def ensure_row_is_list(r: int):
     row = st.session_state.grid[r]
     if not isinstance(row, list) or len(row) != 5:
@@ -224,13 +181,55 @@ def ensure_row_is_list(r: int):
             if not isinstance(st.session_state.grid[r][i], str):
                 st.session_state.grid[r][i] = str(st.session_state.grid[r][i])
 
+def _migrate_legacy_state():
+    """Backfill everything init_state sets for a session started by an older app version; once per session."""
+    ss = st.session_state
+    if ss.get("_grid_v", 0) >= 3:
+        return
+    ss.secret_int = int(ss.secret)
+    ss.secret_digits = tuple(map(int, ss.secret))
+    for key, default in (("round", 0), ("done", False), ("win", False), ("rowbuf", ""), ("error", "")):
+        if key not in ss:
+            ss[key] = default
+    if "grid" not in ss:
+        ss.grid = [["" for _ in range(5)] for _ in range(6)]
+    if "status" not in ss:
+        ss.status = [["neutral"] * 5 for _ in range(6)]
+    if "hints" not in ss:
+        ss.hints = [[] for _ in range(6)]
+    for r in range(6):
+        ensure_row_is_list(r)
+        ss.status[r] = [s or "neutral" for s in ss.status[r]]
+    ss.row_html = [_row_html(ss.grid[r], ss.status[r]) for r in range(6)]
+    ss.hint_html = [_hint_card_html(r, ss.hints[r]) for r in range(6)]
+    # Replay the scored rows, as submit_guess would have folded them
+    ss.knowledge = _new_knowledge()
+    for r in range(6):
+        if ss.status[r][0] != "neutral":
+            _fold_round(ss.knowledge, "".join(ss.grid[r]), ss.status[r], "Ultra")
+    _update_leaderboard_in_state()
+    ss._grid_v = 3
+
+if "secret" not in st.session_state:
+    init_state()
+_migrate_legacy_state()
+
+# init_state and sync_buf_to_grid are the only grid writers and both write
+# 5 strings per row, so the render path needs no per-rerun coercion.
 def sync_buf_to_grid(r: int):
-    ensure_row_is_list(r)
     buf = st.session_state.rowbuf
     row = st.session_state.grid[r]
     for i in range(5):
         row[i] = buf[i] if i < len(buf) else ""
 
+def _on_submit():
+    st.session_state.rowbuf = clean_digits(st.session_state.row_input)
+    if not st.session_state.done:
+        sync_buf_to_grid(st.session_state.round)
+        submit_guess()
+        # a scored miss resets rowbuf; clear the field so it doesn't refill the next row
+        st.session_state.row_input = st.session_state.rowbuf
+
 def submit_guess():
     if st.session_state.done:
         return
@@ -246,19 +245,24 @@ def submit_guess():
         st.session_state.error = f"{msg}"
         return
     secret = st.session_state.secret
-    st.session_state.status[st.session_state.round] = evaluate_guess(secret, guess)
+    statuses = evaluate_guess(secret, guess)
+    st.session_state.status[st.session_state.round] = statuses
+    st.session_state.row_html[st.session_state.round] = _row_html(guess, statuses)
+    # Always record Ultra-only bans; banned_all is only read in Ultra, so a
+    # mid-game switch to Ultra still sees the full history.
+    _fold_round(st.session_state.knowledge, guess, statuses, "Ultra")
     if guess == secret:
         st.session_state.done = True
         st.session_state.win = True
         st.session_state.error = ""
         # record win
-        tries = st.session_state.round + 1
-        data = _load_stats()
-        data.append(tries)
-        _save_stats(data)
+        append_stat(st.session_state.round + 1)
         _update_leaderboard_in_state()
     else:
-        st.session_state.hints[st.session_state.round] = gen_clues(secret, guess, st.session_state.round)
+        r = st.session_state.round
+        hs = gen_clues(secret, guess, r, st.session_state.secret_int, st.session_state.secret_digits)
+        st.session_state.hints[r] = hs
+        st.session_state.hint_html[r] = _hint_card_html(r, hs)  # render the card once, at miss time
         st.session_state.round += 1
         st.session_state.rowbuf = ""
         st.session_state.error = ""
@@ -267,9 +271,8 @@ def submit_guess():
 
 # ============================ Styles ============================
 
-st.markdown(
-    """
-    <style>
+# Sent to the page <head> once per session; see head_style_injector
+_CSS = """
       .title {text-align:center; font-weight:800; font-size:2rem; margin: 0.2rem 0 0.2rem;}
       .subtle {text-align:center; color:#6b7280; margin-bottom: 0.4rem;}
       .leader {text-align:center; color:#374151; font-weight:600; margin-bottom: 0.6rem;}
@@ -311,13 +314,13 @@ st.markdown(
         font-size: 0.95rem;
         color: #111827;
       }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
+"""
+if not st.session_state.get("_css_injected"):
+    components.html(head_style_injector(_CSS), height=0)
+    st.session_state._css_injected = True
 
-st.markdown('<div class="title">Numberdle</div>', unsafe_allow_html=True)
-st.markdown('<div class="subtle">Guess the 5-digit number (00000-99999). 6 tries.</div>', unsafe_allow_html=True)
+_BANNER_HTML = '<div class="title">Numberdle</div><div class="subtle">Guess the 5-digit number (00000-99999). 6 tries.</div>'
+st.markdown(_BANNER_HTML, unsafe_allow_html=True)
 
 # Leaderboard summary
 _last = st.session_state.get("last_solved_tries")
@@ -345,16 +348,16 @@ current_round = st.session_state.round
 if not st.session_state.done:
     sync_buf_to_grid(current_round)  # keep active row tiles in sync
 
-# Build entire board as one HTML string (proper 6x5 grid)
-tiles_html = []
-for r in range(6):
-    ensure_row_is_list(r)
-    for c in range(5):
-        val = st.session_state.grid[r][c]
-        status = st.session_state.status[r][c]
-        css = status if status in {"green", "yellow", "gray"} else "neutral"
-        tiles_html.append(f"<div class='tile {css}'>{val or '&nbsp;'}</div>")
-board_html = "<div class='board'>" + "".join(tiles_html) + "</div>"
+# Build entire board as one HTML string (proper 6x5 grid): scored and future
+# rows come pre-rendered from session state, only the active row is rebuilt.
+rows_html = st.session_state.row_html
+active_attr = ""
+if not st.session_state.done:
+    rows_html = list(rows_html)
+    rows_html[current_round] = _row_html(st.session_state.grid[current_round], st.session_state.status[current_round])
+    # data-row tells the key handler which row to paint while typing
+    active_attr = f" data-row='{current_round}'"
+board_html = f"<div class='board'{active_attr}>" + "".join(rows_html) + "</div>"
 st.markdown(board_html, unsafe_allow_html=True)
 
 # ===================== Single Input + Submit =====================
@@ -364,14 +367,15 @@ with st.form(key=f"row_form_{current_round}"):
     with col_inp:
         typed = st.text_input(
             "Your guess (5 digits)",
-            value=st.session_state.rowbuf,
             max_chars=5,
             help="Type here and press Enter.",
-            key="row_input",   # keep this key stable
+            key="row_input",   # keep this key stable; session state drives the value
             # no autofocus arg (compat)
         )
     with col_btn:
-        submitted = st.form_submit_button("Submit")
+        # Scored in the callback, before this run renders anything, so the
+        # new row shows up without a second st.rerun() pass.
+        st.form_submit_button("Submit", on_click=_on_submit)
 
 # sanitize and update buffer/tiles every render
 cleaned = clean_digits(typed)
@@ -379,10 +383,6 @@ if cleaned != st.session_state.rowbuf:
     st.session_state.rowbuf = cleaned
     sync_buf_to_grid(current_round)
 
-if submitted and not st.session_state.done:
-    submit_guess()
-    st.rerun()
-
 # ============================ Feedback ============================
 
 if st.session_state.error:
@@ -397,20 +397,11 @@ elif st.session_state.done and not st.session_state.win:
 
 st.markdown("### Hints")
 
-cards = []
-for r in range(6):
-    hs = st.session_state.hints[r]
-    if hs:
-        lines_html = "".join(f"<div class='hintline'>{h}</div>" for h in hs)
-        cards.append(
-            f"<div class='hintcard'><div class='hinttitle'>After guess #{r+1}</div>{lines_html}</div>"
-        )
-    else:
-        cards.append(
-            "<div class='hintcard'><div class='hinttitle'>&nbsp;</div><div class='hintline'>&nbsp;</div></div>"
-        )
-
-st.markdown("<div class='hints-grid'>" + "".join(cards) + "</div>", unsafe_allow_html=True)
+# Before the first miss every card is the placeholder
+if st.session_state.round == 0:
+    st.markdown(_EMPTY_HINTS_HTML, unsafe_allow_html=True)
+else:
+    st.markdown("<div class='hints-grid'>" + "".join(st.session_state.hint_html) + "</div>", unsafe_allow_html=True)
 
 # ======================= Type-anywhere key handler =======================
 
@@ -432,29 +423,43 @@ try:
               return inp;
             } catch(e){ return null; }
           }
-          function setVal(v){
-            const inp = getInput(); if(!inp) return;
-            const vv = (v || "").slice(0,5);
-            const last = inp.value;
-            if (document.activeElement !== inp) inp.focus();
-            if (vv === last) return;
-            // set and dispatch
-            inp.value = vv;
-            inp.dispatchEvent(new Event('input', { bubbles: true }));
+          // Digits are painted straight into the board tiles and written
+          // through to the input; it sits in a form, so no key reruns the app.
+          let buf = "";
+          function paint(){
+            const board = window.parent.document.querySelector('.board[data-row]');
+            if (!board) return;
+            const r = parseInt(board.getAttribute('data-row'), 10);
+            const tiles = board.querySelectorAll('.tile');
+            for (let i = 0; i < 5; i++) {
+              const t = tiles[r * 5 + i];
+              if (t) t.textContent = buf[i] || '\u00a0';
+            }
           }
-          function appendChar(ch){
+          const clean = (inp) => inp.value.replace(/[^0-9]/g, "").slice(0,5);
+          function mirror(){
             const inp = getInput(); if(!inp) return;
-            if (document.activeElement !== inp) inp.focus();
-            if (inp.value.length >= 5) return;
-            setVal(inp.value + ch);
+            buf = clean(inp); paint();
           }
-          function backspace(){
+          function setVal(v){
             const inp = getInput(); if(!inp) return;
-            if (document.activeElement !== inp) inp.focus();
-            setVal(inp.value.slice(0, -1));
+            const vv = (v || "").slice(0,5);
+            if (window.parent.document.activeElement !== inp) {
+              inp.focus();
+              // later keys land in the field itself; keep the tiles in step
+              if (inp.__ndMirror) inp.removeEventListener('input', inp.__ndMirror);
+              inp.__ndMirror = mirror;
+              inp.addEventListener('input', mirror);
+            }
+            if (vv === inp.value) return;
+            // React tracks the native setter, so go through it before dispatching
+            const setter = Object.getOwnPropertyDescriptor(window.parent.HTMLInputElement.prototype, 'value').set;
+            setter.call(inp, vv);
+            inp.dispatchEvent(new Event('input', { bubbles: true }));
           }
           function submitForm(){
             const inp = getInput(); if(!inp) return;
+            setVal(buf);
             const form = inp.closest('form');
             if(form){
               const submit = form.querySelector('button[type="submit"]') || form.querySelector('button');
@@ -468,13 +473,19 @@ try:
             if(!inp) return;
             const typingElsewhere = active && active !== inp && (active.tagName === 'INPUT' || active.tagName === 'TEXTAREA' || active.isContentEditable);
             if (typingElsewhere) return;
+            // The input holds the row's digits (every key is written through),
+            // so follow it: a new data-row, New Game or Give Up hands back an
+            // empty field even though this iframe is not reloaded.
+            buf = clean(inp);
 
             if (e.key >= '0' && e.key <= '9') {
               e.preventDefault();
-              appendChar(e.key);
+              if (buf.length < 5) { buf += e.key; paint(); setVal(buf); }
             } else if (e.key === 'Backspace') {
               e.preventDefault();
-              backspace();
+              buf = buf.slice(0, -1);
+              paint();
+              setVal(buf);
             } else if (e.key === 'Enter') {
               e.preventDefault();
               submitForm();
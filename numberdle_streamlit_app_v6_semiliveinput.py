@@ -2,157 +2,103 @@
 # Numberdle with NY Times style typing, side hints, and mode explanations
 # Run: streamlit run numberdle_app_improved.py
 
-import random
-from typing import List, Tuple
 import streamlit as st
+from numberdle_core import (
+    STATUS_CODE, append_stat, clean_digits, evaluate_guess, gen_clues, head_style_injector,
+    migrate_legacy_stats, new_secret, stats_tail,
+)
 
 # Local stats + JS key handler
-import os, json, statistics
+import json
+import queue, threading
 import streamlit.components.v1 as components
-from collections import Counter, defaultdict
 
 st.set_page_config(page_title="Numberdle", layout="wide")
 
-# ============================ Utilities ============================
+# ============================ Simple Stats ============================
 
-def new_secret() -> str:
-    return f"{random.randint(0, 99999):05d}"
+def _stats_writer_loop(q):
+    # Appends only: the log is shared with the other apps, so never rewrite it
+    while True:
+        append_stat(q.get())
 
-def evaluate_guess(secret: str, guess: str) -> List[str]:
-    """Return ['green'|'yellow'|'gray'] x 5 with duplicate handling."""
-    n = 5
-    status = ["gray"] * n
-    remain = {}
-    for i in range(n):
-        s, g = secret[i], guess[i]
-        if g == s:
-            status[i] = "green"
-        else:
-            remain[s] = remain.get(s, 0) + 1
-    for i in range(n):
-        if status[i] == "green":
-            continue
-        g = guess[i]
-        if remain.get(g, 0) > 0:
-            status[i] = "yellow"
-            remain[g] -= 1
-    return status
-
-def clamp_range_around_guess(guess: str, secret: str) -> Tuple[int, int]:
-    g, s = int(guess), int(secret)
-    lo, hi = min(g, s), max(g, s)
-    pad = max(50, (hi - lo) // 5)
-    return max(0, lo - pad), min(99999, hi + pad)
-
-def gen_clues(secret: str, guess: str, round_idx: int) -> List[str]:
-    rng = random.Random(hash((secret, round_idx)) & 0xFFFFFFFF)
-    s_digits = list(map(int, secret))
-    s_val = int(secret)
-    clues = []
-    lo, hi = clamp_range_around_guess(guess, secret)
-    clues.append(f"The number is between {lo:05d} and {hi:05d}.")
-    clues.append("It is an even number." if s_val % 2 == 0 else "It is an odd number.")
-    clues.append(f"Sum of digits {sum(s_digits) % 3} (mod 3).")
-    i, j = rng.choice([(0,1),(1,2),(2,3),(3,4)])
-    rel = "<" if s_digits[i] < s_digits[j] else (">" if s_digits[i] > s_digits[j] else "=")
-    clues.append(f"Digit {i+1} {rel} digit {j+1}.")
-    clues.append("At least one digit repeats." if len(set(secret)) < 5 else "All digits are distinct.")
-    pick = rng.sample(range(len(clues)), k=2)
-    return [clues[k] for k in sorted(pick)]
-
-def clean_digits(s: str) -> str:
-    return "".join(ch for ch in s if ch.isdigit())[:5]
+@st.cache_resource
+def _stats_writer():
+    """Queue of solve counts drained by one daemon thread, so wins don't block on disk I/O."""
+    q = queue.Queue()
+    threading.Thread(target=_stats_writer_loop, args=(q,), daemon=True, name="numberdle-stats").start()
+    return q
 
-# ============================ Simple Stats ============================
+def _update_leaderboard_in_state(pending: bytes = b""):
+    # pending: a win about to be queued, so not on disk yet
+    tail = stats_tail(10 - len(pending)) + pending
+    st.session_state.last_solved_tries = (tail[-1] if tail else None)
+    st.session_state.last10_avg = (round(sum(tail) / len(tail), 2) if tail else None)
 
-STATS_PATH = "numberdle_stats.json"
-
-def _load_stats():
-    try:
-        if os.path.exists(STATS_PATH):
-            with open(STATS_PATH, "r") as f:
-                data = json.load(f)
-            if isinstance(data, list):
-                out = []
-                for x in data:
-                    try:
-                        out.append(int(x))
-                    except Exception:
-                        pass
-                return out
-    except Exception:
-        pass
-    return []
-
-def _save_stats(data):
-    try:
-        with open(STATS_PATH, "w") as f:
-            json.dump([int(x) for x in data], f)
-    except Exception:
-        pass
-
-def _update_leaderboard_in_state():
-    data = _load_stats()
-    st.session_state.last_solved_tries = (data[-1] if data else None)
-    st.session_state.last10_avg = (round(statistics.mean(data[-10:]), 2) if data else None)
+migrate_legacy_stats()
 
 # ====================== Hard/Ultra Mode Helpers ======================
 
+# Board layout: flat bytearray(30) per game, cell (r, c) at r*5 + c.
+# grid holds ASCII digit bytes (0 = empty); status holds STATUS_CODE values.
+_GREEN, _YELLOW, _GRAY = STATUS_CODE["green"], STATUS_CODE["yellow"], STATUS_CODE["gray"]
+_STATUS_CLASS = ("neutral", "green", "yellow", "gray")  # indexed by status code
+
 def _build_knowledge(upto_round: int, mode: str):
     """Aggregate constraints from previous feedback."""
-    greens = {}                      # position -> digit (str)
-    min_count = defaultdict(int)     # digit -> minimum occurrences
-    max_count = defaultdict(lambda: 5)  # digit -> maximum occurrences
-    banned_yellow = defaultdict(set) # digit -> positions not allowed (yellow spots)
-    banned_all = defaultdict(set)    # digit -> positions not allowed (yellow + gray-derived in Ultra)
-
-    for r in range(upto_round):
-        row = st.session_state.grid[r]
-        sts = st.session_state.status[r]
-        # Tolerate partially empty rows
-        if not row or not sts: 
-            continue
-        counts = Counter([d for d in row if d != ""])
-        matches = Counter()
+    grid = st.session_state.grid
+    status = st.session_state.status
+    # Digits are 0..9 and positions 0..4, so per-digit lists and 5-bit masks suffice
+    greens = {}                # position -> digit (str)
+    min_count = [0] * 10       # digit -> minimum occurrences
+    max_count = [5] * 10       # digit -> maximum occurrences
+    banned_yellow = [0] * 10   # digit -> position bitmask not allowed (yellow spots)
+    banned_all = [0] * 10      # digit -> position bitmask not allowed (yellow + gray-derived in Ultra)
+
+    for base in range(0, upto_round * 5, 5):
+        counts = [0] * 10
+        matches = [0] * 10
+        grays = [0] * 10       # digit -> positions where it came back gray this round
 
         # Collect greens/yellows and per-round matches
         for i in range(5):
-            d = row[i]
-            if d == "":
+            # Tolerate partially empty rows
+            ch = grid[base + i]
+            if not ch:
                 continue
-            s = sts[i]
-            if s == "green":
-                greens[i] = d
+            d = ch - 48
+            counts[d] += 1
+            s = status[base + i]
+            if s == _GREEN:
+                greens[i] = chr(ch)
                 matches[d] += 1
-            elif s == "yellow":
-                banned_yellow[d].add(i)
-                banned_all[d].add(i)
+            elif s == _YELLOW:
+                banned_yellow[d] |= 1 << i
+                banned_all[d] |= 1 << i
                 matches[d] += 1
-            elif s == "gray":
+            elif s == _GRAY:
                 # in Ultra we'll add gray positions to banned_all only when there are some matches for that digit in the same round
-                pass
+                grays[d] |= 1 << i
 
-        # Update min counts from this round's matches
-        for d, k in matches.items():
+        for d in range(10):
+            k = matches[d]
+            # Update min counts from this round's matches
             if k > min_count[d]:
                 min_count[d] = k
-
-        # Update max counts & gray-position bans per round
-        for d, m in counts.items():
-            k = matches.get(d, 0)
+            if not counts[d]:
+                continue
+            # Update max counts & gray-position bans per round
             if k == 0:
                 # digit was guessed this round but had 0 matches => secret contains 0 of this digit
                 # only applied as a hard cap in Ultra
-                max_count[d] = min(max_count[d], 0)
+                max_count[d] = 0
             else:
                 # cap by observed matches for this round (Ultra)
                 if max_count[d] > k:
                     max_count[d] = k
                 # Ultra: any gray instances of this digit in this round are position-banned
                 if mode == "Ultra":
-                    for i in range(5):
-                        if row[i] == d and sts[i] == "gray":
-                            banned_all[d].add(i)
+                    banned_all[d] |= grays[d]
 
     return greens, min_count, max_count, banned_yellow, banned_all
 
@@ -169,53 +115,110 @@ def _validate_guess_against_history(guess: str, mode: str) -> (bool, str):
         if guess[i] != d:
             return False, f"Position {i+1} must be {d} based on previous feedback."
 
-    # Count occurrences in this guess
-    gcount = Counter(guess)
+    # Count occurrences in this guess, and where each digit sits (5-bit mask)
+    gcount = [0] * 10
+    gpos = [0] * 10
+    for i, ch in enumerate(guess):
+        d = int(ch)
+        gcount[d] += 1
+        gpos[d] |= 1 << i
 
     # Hard rules: include all known digits (at least min_count) and avoid yellowed positions
-    for d, mn in min_count.items():
-        if gcount.get(d, 0) < mn:
-            needed = mn - gcount.get(d, 0)
+    for d in range(10):
+        mn = min_count[d]
+        if gcount[d] < mn:
+            needed = mn - gcount[d]
             return False, f"Use digit {d} at least {mn} time(s); missing {needed}."
-    for d, bad_idxs in banned_yellow.items():
-        for i in bad_idxs:
-            if guess[i] == d:
-                return False, f"Digit {d} cannot be in position {i+1} (yellow earlier)."
+    for d in range(10):
+        hit = gpos[d] & banned_yellow[d]
+        if hit:
+            i = (hit & -hit).bit_length() - 1  # lowest offending position
+            return False, f"Digit {d} cannot be in position {i+1} (yellow earlier)."
 
     if mode == "Ultra":
         # No disallowed digits & respect max counts
-        for d, mx in max_count.items():
-            if mx == 0 and gcount.get(d, 0) > 0:
+        for d in range(10):
+            mx = max_count[d]
+            if mx == 0 and gcount[d] > 0:
                 return False, f"Digit {d} is not in the number based on earlier feedback."
-            if gcount.get(d, 0) > mx:
+            if gcount[d] > mx:
                 return False, f"Too many '{d}' digits; max allowed is {mx}."
         # Also ban gray-derived positions
-        for d, bad_idxs in banned_all.items():
-            for i in bad_idxs:
-                if guess[i] == d:
-                    return False, f"Digit {d} cannot be in position {i+1} (ruled out earlier)."
+        for d in range(10):
+            hit = gpos[d] & banned_all[d]
+            if hit:
+                i = (hit & -hit).bit_length() - 1
+                return False, f"Digit {d} cannot be in position {i+1} (ruled out earlier)."
 
     return True, ""
 
 
+# ============================ Board HTML ============================
+
+def _tile_html(r: int, c: int, val: str, css: str) -> str:
+    return f"<div class='tile {css}' id='tile-{r}-{c}'>{val or '&nbsp;'}</div>"
+
+# Empty tiles never change: per-cell strings, and the joined rows r..5 for each r
+_NEUTRAL_TILES = [[_tile_html(r, c, "", "neutral") for c in range(5)] for r in range(6)]
+_EMPTY_TAIL = ["".join(t for row in _NEUTRAL_TILES[r:] for t in row) for r in range(7)]
+
+def _done_row_html(r: int) -> str:
+    # Tiles for a finished guess row; these never change once submitted
+    grid, status = st.session_state.grid, st.session_state.status
+    out = []
+    for c in range(5):
+        ch = grid[r * 5 + c]
+        out.append(_tile_html(r, c, chr(ch) if ch else "", _STATUS_CLASS[status[r * 5 + c]]))
+    return "".join(out)
+
+def _hint_card_html(r: int) -> str:
+    hs = st.session_state.hints[r]
+    if hs:
+        lines_html = "".join(f"<div class='hintline'>• {h}</div>" for h in hs)
+        return f"<div class='hintcard'><div class='hinttitle'>After guess #{r+1}</div>{lines_html}</div>"
+    return f"<div class='hintcard'><div class='hinttitle'>Guess #{r+1}</div><div class='hintline'>No hints available</div></div>"
+
+_HINTS_PLACEHOLDER = "<div class='hintcard'><div class='hintline'>Hints will appear after each guess</div></div>"
+
+def _rebuild_html_prefixes():
+    # Stable HTML for completed rows; submit_guess() appends to these
+    rows_done = st.session_state.round + (1 if st.session_state.win else 0)
+    st.session_state._board_html_prefix = "".join(_done_row_html(r) for r in range(rows_done))
+    st.session_state._hints_html_prefix = "".join(_hint_card_html(r) for r in range(st.session_state.round))
+
 # ============================ State ============================
 
 def init_state():
     st.session_state.secret = new_secret()
+    # Parsed once per game; gen_clues looks up parity/sum/repeat facts from these
+    st.session_state.secret_int = int(st.session_state.secret)
+    st.session_state.secret_digits = tuple(map(int, st.session_state.secret))
     st.session_state.round = 0
-    st.session_state.grid = [["" for _ in range(5)] for _ in range(6)]
-    st.session_state.status = [["" for _ in range(5)] for _ in range(6)]
+    st.session_state.grid = bytearray(30)
+    st.session_state.status = bytearray(30)
     st.session_state.done = False
     st.session_state.win = False
     st.session_state.hints = [[] for _ in range(6)]
     st.session_state.current_input = ""
+    st.session_state.main_input = ""
     st.session_state.error = ""
+    st.session_state._board_html_prefix = ""
+    st.session_state._hints_html_prefix = ""
     if 'mode' not in st.session_state:
         st.session_state.mode = "Normal"
     _update_leaderboard_in_state()
 
 if "secret" not in st.session_state:
     init_state()
+if isinstance(st.session_state.grid, list):
+    # Sessions started before the flat layout kept 6x5 lists of str
+    st.session_state.grid = bytearray(ord(ch) if ch else 0 for row in st.session_state.grid for ch in row)
+    st.session_state.status = bytearray(STATUS_CODE.get(x, 0) for row in st.session_state.status for x in row)
+if "_board_html_prefix" not in st.session_state:
+    _rebuild_html_prefixes()
+if "secret_int" not in st.session_state:
+    st.session_state.secret_int = int(st.session_state.secret)
+    st.session_state.secret_digits = tuple(map(int, st.session_state.secret))
 
 def submit_guess():
     if st.session_state.done:
@@ -233,68 +236,49 @@ def submit_guess():
         return
     
     # Update grid with current input
-    for i in range(5):
-        st.session_state.grid[st.session_state.round][i] = current_input[i] if i < len(current_input) else ""
+    base = st.session_state.round * 5
+    st.session_state.grid[base:base + 5] = guess.encode()
     
     secret = st.session_state.secret
-    st.session_state.status[st.session_state.round] = evaluate_guess(secret, guess)
+    st.session_state.status[base:base + 5] = bytes(STATUS_CODE[x] for x in evaluate_guess(secret, guess))
+    st.session_state._board_html_prefix += _done_row_html(st.session_state.round)
     if guess == secret:
         st.session_state.done = True
         st.session_state.win = True
         st.session_state.error = ""
         # record win
         tries = st.session_state.round + 1
-        data = _load_stats()
-        data.append(tries)
-        _save_stats(data)
-        _update_leaderboard_in_state()
+        # Read the tail before queueing: once queued, the writer may append
+        # this win before the read and it would count twice
+        _update_leaderboard_in_state(bytes([tries]))
+        _stats_writer().put(tries)
     else:
-        st.session_state.hints[st.session_state.round] = gen_clues(secret, guess, st.session_state.round)
+        st.session_state.hints[st.session_state.round] = gen_clues(
+            secret, guess, st.session_state.round,
+            st.session_state.secret_int, st.session_state.secret_digits,
+        )
+        st.session_state._hints_html_prefix += _hint_card_html(st.session_state.round)
         st.session_state.round += 1
         st.session_state.current_input = ""
         st.session_state.error = ""
         if st.session_state.round >= 6:
             st.session_state.done = True
 
+def _on_submit():
+    st.session_state.current_input = clean_digits(st.session_state.main_input)
+    if not st.session_state.done:
+        submit_guess()
+        # a scored miss resets current_input; clear the field so it doesn't refill the next row
+        st.session_state.main_input = st.session_state.current_input
+
 # ============================ Styles ============================
 
-st.markdown(
-    """
-    <style>
+# Sent to the page <head> once per session; see head_style_injector
+_CSS = """
       .title {text-align:center; font-weight:800; font-size:2rem; margin: 0.2rem 0 0.2rem;}
       .subtle {text-align:center; color:#6b7280; margin-bottom: 0.4rem;}
       .leader {text-align:center; color:#374151; font-weight:600; margin-bottom: 0.6rem;}
       
-      .board {display:grid; grid-template-columns: repeat(5, 60px); gap:10px; justify-content:center; margin: 12px 0 14px;}
-      .tile {height:60px; width:60px; border-radius:10px; display:flex; align-items:center; justify-content:center;
-             font-size:1.4rem; font-weight:800; border:2px solid #e5e7eb; background:#f9fafb; color:#111827;}
-      .green {background:#16a34a; color:#fff; border-color:#16a34a;}
-      .yellow {background:#f59e0b; color:#fff; border-color:#f59e0b;}
-      .gray {background:#9ca3af; color:#fff; border-color:#9ca3af;}
-      .current {border-color:#3b82f6; border-width:3px; background:#dbeafe;}
-      .neutral {}
-      
-      .hints-side {width: 100%; max-width: 350px;}
-      .hintcard {
-        background: #f3f4f6;
-        border: 1px solid #e5e7eb;
-        border-radius: 10px;
-        padding: 10px 12px;
-        margin-bottom: 8px;
-        min-height: 50px;
-      }
-      .hinttitle {
-        font-weight: 700;
-        margin-bottom: 6px;
-        font-size: 0.9rem;
-        color: #374151;
-      }
-      .hintline {
-        font-size: 0.85rem;
-        color: #111827;
-        margin-bottom: 3px;
-      }
-      
       .center {display:flex; align-items:center; justify-content:center; gap:10px;}
       
       /* Mode descriptions */
@@ -324,21 +308,56 @@ st.markdown(
         opacity: 0.01 !important;
         pointer-events: none !important;
       }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
+"""
+# Board + hints live in their own iframe, which the page <head> doesn't reach
+_PLAY_CSS = """
+      body {margin: 0; font-family: "Source Sans Pro", sans-serif; color: #111827;}
+      .board {display:grid; grid-template-columns: repeat(5, 60px); gap:10px; justify-content:center; margin: 12px 0 14px;}
+      .tile {height:60px; width:60px; border-radius:10px; display:flex; align-items:center; justify-content:center;
+             font-size:1.4rem; font-weight:800; border:2px solid #e5e7eb; background:#f9fafb; color:#111827;}
+      .green {background:#16a34a; color:#fff; border-color:#16a34a;}
+      .yellow {background:#f59e0b; color:#fff; border-color:#f59e0b;}
+      .gray {background:#9ca3af; color:#fff; border-color:#9ca3af;}
+      .current {border-color:#3b82f6; border-width:3px; background:#dbeafe;}
+      .neutral {}
+      
+      .play {display:grid; grid-template-columns: 1.5fr 1fr; gap: 16px; align-items:start;}
+      .hints-side {width: 100%; max-width: 350px; max-height: 500px; overflow-y: auto;}
+      .hints-head {font-weight:700; margin: 12px 0 8px;}
+      .hintcard {
+        background: #f3f4f6;
+        border: 1px solid #e5e7eb;
+        border-radius: 10px;
+        padding: 10px 12px;
+        margin-bottom: 8px;
+        min-height: 50px;
+      }
+      .hinttitle {
+        font-weight: 700;
+        margin-bottom: 6px;
+        font-size: 0.9rem;
+        color: #374151;
+      }
+      .hintline {
+        font-size: 0.85rem;
+        color: #111827;
+        margin-bottom: 3px;
+      }
+"""
 
-st.markdown('<div class="title">Numberdle</div>', unsafe_allow_html=True)
-st.markdown('<div class="subtle">Guess the 5-digit number (00000-99999). 6 tries. Just start typing!</div>', unsafe_allow_html=True)
+if not st.session_state.get("_css_injected"):
+    components.html(head_style_injector(_CSS), height=0)
+    st.session_state._css_injected = True
 
-# Leaderboard summary
+_BANNER_HTML = '<div class="title">Numberdle</div><div class="subtle">Guess the 5-digit number (00000-99999). 6 tries. Just start typing!</div>'
+
+# Leaderboard summary (same element as the banner)
 _last = st.session_state.get("last_solved_tries")
 _avg = st.session_state.get("last10_avg")
 leader_txt = []
 leader_txt.append(f"Last solved in {int(_last)} tries" if _last is not None else "No solves yet")
 leader_txt.append(f"Last 10 average: {float(_avg):.2f}" if _avg is not None else "Last 10 average: --")
-st.markdown(f"<div class='leader'>{' | '.join(leader_txt)}</div>", unsafe_allow_html=True)
+st.markdown(_BANNER_HTML + f"<div class='leader'>{' | '.join(leader_txt)}</div>", unsafe_allow_html=True)
 
 # ============================ Controls ============================
 
@@ -358,112 +377,187 @@ if st.session_state.done and not st.session_state.win:
 current_round = st.session_state.round
 current_input = st.session_state.current_input
 
-# Build board and hints side by side
-board_col, hints_col = st.columns([1.5, 1])
-
-with board_col:
-    # Build entire board as one HTML string
-    tiles_html = []
-    for r in range(6):
-        for c in range(5):
-            if r == current_round and not st.session_state.done:
-                # Current active row - show what's being typed
-                val = current_input[c] if c < len(current_input) else ""
-                if c < len(current_input):
-                    css = "neutral"
-                elif c == len(current_input):
-                    css = "current"  # Blue border for next position
-                else:
-                    css = "neutral"
-            else:
-                # Completed or future rows
-                val = st.session_state.grid[r][c] if st.session_state.grid[r][c] else ""
-                status = st.session_state.status[r][c] if st.session_state.status[r][c] else ""
-                css = status if status in {"green", "yellow", "gray"} else "neutral"
-            
-            tiles_html.append(f"<div class='tile {css}' id='tile-{r}-{c}'>{val or '&nbsp;'}</div>")
-    
-    board_html = "<div class='board'>" + "".join(tiles_html) + "</div>"
-    st.markdown(board_html, unsafe_allow_html=True)
-
-with hints_col:
-    st.markdown("**💡 Hints**")
-    
-    hints_html = ""
-    for r in range(6):
-        hs = st.session_state.hints[r]
-        if hs:
-            lines_html = "".join(f"<div class='hintline'>• {h}</div>" for h in hs)
-            hints_html += f"<div class='hintcard'><div class='hinttitle'>After guess #{r+1}</div>{lines_html}</div>"
-        elif r < st.session_state.round:
-            hints_html += f"<div class='hintcard'><div class='hinttitle'>Guess #{r+1}</div><div class='hintline'>No hints available</div></div>"
-    
-    if hints_html:
-        st.markdown(f"<div class='hints-side'>{hints_html}</div>", unsafe_allow_html=True)
-    else:
-        st.markdown("<div class='hints-side'><div class='hintcard'><div class='hintline'>Hints will appear after each guess</div></div></div>", unsafe_allow_html=True)
+# Completed rows come from the cached prefix; only the active row is built here
+tiles_html = [st.session_state._board_html_prefix]
+next_row = current_round + (1 if st.session_state.win else 0)
+if not st.session_state.done:
+    # Current active row - show what's being typed
+    n_typed = len(current_input)
+    for c in range(5):
+        if c < n_typed:
+            tiles_html.append(_tile_html(current_round, c, current_input[c], "neutral"))
+        elif c == n_typed:
+            tiles_html.append(_tile_html(current_round, c, "", "current"))  # Blue border for next position
+        else:
+            tiles_html.append(_NEUTRAL_TILES[current_round][c])
+    next_row += 1
+tiles_html.append(_EMPTY_TAIL[next_row])
+
+# data-row marks the row the key handler types into (absent once the game ends)
+board_attr = "" if st.session_state.done else f" data-row='{current_round}'"
+board_html = f"<div class='board'{board_attr}>" + "".join(tiles_html) + "</div>"
+
+hints_html = st.session_state._hints_html_prefix or _HINTS_PLACEHOLDER
+
+# Typing stays client-side: digits are buffered here, painted into the active
+# row and written through to the hidden input. That input is inside a form, so
+# the server only sees them on submit.
+# Listeners go on the parent document, so each load first removes the ones
+# a previous (now replaced) iframe left behind.
+_PLAY_JS = """
+<script>
+(function() {
+  const doc = window.parent.document;
+  if (window.parent.__ndKeysOff) window.parent.__ndKeysOff();
+  window.parent.__ndKeysOff = null;
+
+  function getInput() {
+    return doc.querySelector('input[aria-label*="Hidden typing input"]');
+  }
+  // Clicks in this frame hand focus back to the hidden input
+  document.addEventListener('click', function() {
+    const inp = getInput();
+    if (inp) inp.focus();
+  });
+
+  const board = document.querySelector('.board[data-row]');
+  if (!board) return;  // game over: nothing to type into
+  const r = parseInt(board.getAttribute('data-row'), 10);
+  const tiles = [];
+  for (let c = 0; c < 5; c++) tiles.push(document.getElementById('tile-' + r + '-' + c));
+  let buf = INIT_BUF;
+
+  function paint() {
+    for (let c = 0; c < 5; c++) {
+      tiles[c].textContent = buf[c] || '\u00a0';
+      tiles[c].className = 'tile ' + (c === buf.length ? 'current' : 'neutral');
+    }
+  }
+  function setVal(v) {
+    const inp = getInput(); if (!inp) return;
+    // React tracks the native setter, so go through it before dispatching
+    const setter = Object.getOwnPropertyDescriptor(window.parent.HTMLInputElement.prototype, 'value').set;
+    setter.call(inp, v);
+    inp.dispatchEvent(new Event('input', { bubbles: true }));
+  }
+  function submitForm() {
+    const inp = getInput(); if (!inp) return;
+    setVal(buf);
+    const form = inp.closest('form');
+    const submit = form && (form.querySelector('button[type="submit"]') || form.querySelector('button'));
+    if (submit) setTimeout(function() { submit.click(); }, 0);
+  }
+  function onKey(e) {
+    if (e.ctrlKey || e.metaKey || e.altKey) return;
+    // Leave other text fields alone
+    const active = doc.activeElement;
+    if (active && active !== getInput() && (active.tagName === 'INPUT' || active.tagName === 'TEXTAREA' || active.isContentEditable)) return;
+    if (e.key >= '0' && e.key <= '9' && e.key.length === 1) {
+      e.preventDefault();
+      if (buf.length < 5) { buf += e.key; paint(); setVal(buf); }
+    } else if (e.key === 'Backspace') {
+      e.preventDefault();
+      buf = buf.slice(0, -1);
+      paint();
+      setVal(buf);
+    } else if (e.key === 'Enter') {
+      e.preventDefault();
+      submitForm();
+    }
+  }
+  doc.addEventListener('keydown', onKey, true);
+  document.addEventListener('keydown', onKey, true);
+  const off = function() { doc.removeEventListener('keydown', onKey, true); };
+  window.parent.__ndKeysOff = off;
+  window.addEventListener('pagehide', function() {
+    off();
+    if (window.parent.__ndKeysOff === off) window.parent.__ndKeysOff = null;
+  });
+})();
+</script>
+"""
+
+# Board and hints side by side in one static iframe: plain HTML, so no
+# markdown parse/sanitize pass
+components.html(
+    f"<!doctype html><style>{_PLAY_CSS}</style>"
+    f"<div class='play'><div>{board_html}</div>"
+    f"<div class='hints-side'><div class='hints-head'>💡 Hints</div>{hints_html}</div></div>"
+    f"<script>const INIT_BUF = {json.dumps(current_input)};</script>" + _PLAY_JS,
+    height=520,
+)
 
 # ============================ Hidden Input Handler ============================
 
 # This is the key - hidden but functional input that auto-focuses
 with st.form(key="typing_form", clear_on_submit=False):
-    typed_input = st.text_input(
+    st.text_input(
         "Hidden typing input",
-        value=st.session_state.current_input,
         max_chars=5,
         key="main_input",
         help="This handles all typing - you don't need to click here"
     )
     
-    # Submit happens on Enter or when length reaches 5
-    submitted = st.form_submit_button("Submit", type="primary")
-
-# Process input changes
-cleaned_input = clean_digits(typed_input)
-if cleaned_input != st.session_state.current_input:
-    st.session_state.current_input = cleaned_input
-    st.rerun()
-
-# Auto-submit when 5 digits are entered
-if len(cleaned_input) == 5 and not st.session_state.done and not submitted:
-    # Don't auto-submit, let user press Enter
-    pass
+    # Submit happens on Enter; scoring runs in the callback, before the rerun renders
+    st.form_submit_button("Submit", type="primary", on_click=_on_submit)
 
-# Handle form submission
-if submitted and not st.session_state.done:
-    submit_guess()
-    st.rerun()
-
-# Auto-focus script to keep input always focused
+# Auto-focus script to keep input always focused. The payload never changes, so
+# reruns leave the iframe alone; if it is ever reloaded, the new copy first
+# disconnects whatever observer the old one left on the parent page.
 components.html(
     """
     <script>
     (function() {
+        const doc = window.parent.document;
+        if (window.parent.__ndFocusOff) window.parent.__ndFocusOff();
+        let observer = null;
+        const off = function() {
+            if (observer) observer.disconnect();
+            observer = null;
+        };
+        window.parent.__ndFocusOff = off;
+        window.addEventListener('pagehide', function() {
+            off();
+            if (window.parent.__ndFocusOff === off) window.parent.__ndFocusOff = null;
+        });
+
+        let cached = null;  // the hidden input, looked up once and reused
+
+        function findInput() {
+            if (cached && cached.isConnected) return cached;
+            cached = null;
+            const inputs = doc.querySelectorAll('input[type="text"]');
+            for (let input of inputs) {
+                if (input.getAttribute('aria-label') && input.getAttribute('aria-label').includes('Hidden typing input')) {
+                    cached = input;
+                    break;
+                }
+            }
+            return cached;
+        }
+
         function focusInput() {
             try {
-                const inputs = window.parent.document.querySelectorAll('input[type="text"]');
-                for(let input of inputs) {
-                    if(input.getAttribute('aria-label') && input.getAttribute('aria-label').includes('Hidden typing input')) {
-                        input.focus();
-                        input.style.caretColor = 'transparent';
-                        break;
-                    }
-                }
+                const input = findInput();
+                if (!input) return false;
+                input.focus();
+                input.style.caretColor = 'transparent';
+                return doc.activeElement === input;
             } catch(e) {
                 console.log('Focus attempt failed:', e);
+                return false;
             }
         }
-        
-        // Focus immediately
-        setTimeout(focusInput, 100);
-        
-        // Re-focus when clicking anywhere
-        document.addEventListener('click', function() {
-            setTimeout(focusInput, 50);
-        });
-        
-        // Re-focus on any interaction
-        setInterval(focusInput, 1000);
+
+        // Focus once the input is in the page; watch for it only until then
+        setTimeout(function() {
+            if (focusInput() || window.parent.__ndFocusOff !== off) return;
+            observer = new MutationObserver(function() {
+                if (focusInput()) off();
+            });
+            observer.observe(doc.body, {childList: true, subtree: true});
+        }, 100);
+        // Clicks are handled by the board frame, which hands focus back
     })();
     </script>
     """,